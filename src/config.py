@@ -1,8 +1,7 @@
+import math
 import os
 from datetime import datetime
 
-from scipy.stats import norm
-
 # Base project directory
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -20,7 +19,8 @@ TICKERS = {"S&P 500": "^GSPC", "NASDAQ": "^IXIC"}
 
 # VaR Calculation Settings
 CONFIDENCE_LEVEL = 0.95
-MONTE_CARLO_SIMULATIONS = 10000
+MONTE_CARLO_SIMULATIONS = 10000  # keep even for exact antithetic pairs
+MC_SEED = 42  # seeds the shared Monte Carlo normal pool
 TRADING_DAYS_PER_YEAR = 252
 
 # Risk-free Rate (annualized)
@@ -29,9 +29,28 @@ RISK_FREE_RATE = 0.02  # Adjust based on current market conditions
 # VaR horizon (days)
 VAR_HORIZON_DAYS = 10
 
+# One-tailed z-scores ``norm.ppf(1 - cl)`` for the usual confidence levels;
+# every z-score lookup in the package starts here, so scipy is only
+# imported for levels off the table
+Z_SCORES = {
+    0.90: -1.2815515655446004,
+    0.95: -1.6448536269514722,
+    0.975: -1.959963984540054,
+    0.99: -2.3263478740408408,
+    0.995: -2.5758293035489004,
+}
+
 # Compute the corresponding z‐score for the one‐tailed lower‐quantile VaR
 # e.g. if CONFIDENCE_LEVEL = 0.95 → norm.ppf(1 - 0.95) ≈ -1.645
-CONFIDENCE_Z = norm.ppf(1 - CONFIDENCE_LEVEL)
+if CONFIDENCE_LEVEL in Z_SCORES:
+    CONFIDENCE_Z = Z_SCORES[CONFIDENCE_LEVEL]
+else:
+    from scipy.stats import norm
+
+    CONFIDENCE_Z = float(norm.ppf(1 - CONFIDENCE_LEVEL))
+
+# Horizon-scaled z-score, precomputed for parametric VaR at the defaults above
+VAR_SCALE = CONFIDENCE_Z * math.sqrt(VAR_HORIZON_DAYS)
 
 # EWMA smoothing parameter
 EWMA_LAMBDA = 0.72  # decay factor λ
@@ -0,0 +1,253 @@
+"""Array kernels behind the hot paths, compiled with Numba when available.
+
+Every kernel has a NumPy fallback with the same semantics, used when
+Numba is not installed; reductions there use Bottleneck if present.
+"""
+
+import math
+from typing import Callable, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit, prange
+except ImportError:  # pragma: no cover - numba is optional
+    njit = None  # type: ignore[assignment]
+    prange = range  # type: ignore[misc]
+
+try:
+    import bottleneck as bn
+except ImportError:  # pragma: no cover - bottleneck is optional
+    bn = None
+
+
+def _jit(fallback: Callable, **options) -> Callable:
+    """Compile the decorated kernel with Numba, or return ``fallback``."""
+
+    def decorate(func: Callable) -> Callable:
+        if njit is None:
+            return fallback
+        return njit(cache=True, **options)(func)
+
+    return decorate
+
+
+def _count_transitions_numpy(b: np.ndarray) -> Tuple[int, int, int, int]:
+    b = (b != 0).view(np.uint8)
+    counts = np.bincount((b[:-1] << 1) | b[1:], minlength=4)
+    return int(counts[0]), int(counts[1]), int(counts[2]), int(counts[3])
+
+
+@_jit(_count_transitions_numpy, nogil=True)
+def count_transitions(b: np.ndarray) -> Tuple[int, int, int, int]:
+    """Counts ``(N00, N01, N10, N11)`` of consecutive pairs in a 0/1 array.
+
+    Nonzero values count as 1, so the index never leaves ``counts``.
+    """
+    counts = np.zeros(4, np.int64)
+    for i in range(1, b.size):
+        counts[2 * (b[i - 1] != 0) + (b[i] != 0)] += 1
+    return counts[0], counts[1], counts[2], counts[3]
+
+
+def _kupiec_lr_numpy(b: np.ndarray, alpha: float) -> Tuple[int, int, float]:
+    n = b.size
+    x = int(np.count_nonzero(b))
+    if x == 0 or x == n:
+        return n, x, np.nan
+    p = 1.0 - alpha
+    p_hat = x / n
+    lr = -2.0 * (
+        (n - x) * (math.log1p(-p) - math.log1p(-p_hat))
+        + x * (math.log(p) - math.log(p_hat))
+    )
+    return n, x, lr
+
+
+@_jit(_kupiec_lr_numpy, nogil=True)
+def kupiec_lr(b: np.ndarray, alpha: float) -> Tuple[int, int, float]:
+    """``(n, x, LR)`` of Kupiec's POF test for a 0/1 breach array.
+
+    ``LR`` is NaN when there are no breaches or only breaches.
+    """
+    n = b.size
+    x = 0
+    for i in range(n):
+        x += b[i] != 0
+    if x == 0 or x == n:
+        return n, x, np.nan
+    p = 1.0 - alpha
+    p_hat = x / n
+    # kept in log space so large n cannot underflow
+    lr = -2.0 * (
+        (n - x) * (math.log1p(-p) - math.log1p(-p_hat))
+        + x * (math.log(p) - math.log(p_hat))
+    )
+    return n, x, lr
+
+
+def _rolling_std_pandas(x: np.ndarray, w: int) -> np.ndarray:
+    # built-in Cython rolling std, never rolling.apply
+    return pd.Series(x).rolling(window=w, min_periods=w).std(ddof=1).to_numpy()
+
+
+@_jit(_rolling_std_pandas)
+def rolling_std(x: np.ndarray, w: int) -> np.ndarray:
+    """Rolling sample std over ``w`` points via Welford add/remove updates.
+
+    Windows holding a NaN are NaN, as with ``Series.rolling(w).std()``.
+    """
+    n = x.size
+    out = np.full(n, np.nan)
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        xi = x[i]
+        if not math.isnan(xi):
+            count += 1
+            delta = xi - mean
+            mean += delta / count
+            m2 += delta * (xi - mean)
+        if i >= w:
+            xo = x[i - w]
+            if not math.isnan(xo):
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    delta = xo - mean
+                    mean -= delta / count
+                    m2 -= delta * (xo - mean)
+        if count == w and w > 1:
+            out[i] = math.sqrt(max(m2, 0.0) / (w - 1))
+    return out
+
+
+def _mean_std_numpy(x: np.ndarray) -> Tuple[float, float]:
+    if bn is not None:
+        # C reductions that skip NaNs without building a masked copy
+        return float(bn.nanmean(x)), float(bn.nanstd(x, ddof=1))
+    x = x[~np.isnan(x)]
+    if x.size < 2:
+        return (float(x[0]) if x.size else np.nan), np.nan
+    return float(x.mean()), float(x.std(ddof=1))
+
+
+@_jit(_mean_std_numpy, nogil=True)
+def mean_std(x: np.ndarray) -> Tuple[float, float]:
+    """Mean and sample std of the non-NaN values in one Welford pass."""
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(x.size):
+        xi = x[i]
+        if not math.isnan(xi):
+            n += 1
+            delta = xi - mean
+            mean += delta / n
+            m2 += delta * (xi - mean)
+    if n == 0:
+        return np.nan, np.nan
+    if n == 1:
+        return mean, np.nan
+    return mean, math.sqrt(m2 / (n - 1))
+
+
+def select_quantile(a: np.ndarray, q: float, axis: int = -1):
+    """Linearly interpolated ``q``-quantile of NaN-free ``a`` along ``axis``.
+
+    Partitions ``a`` in place around the two order statistics that
+    ``np.quantile`` interpolates between, so pass a scratch array.
+    """
+    n = a.shape[axis]
+    pos = q * (n - 1)
+    lo = int(math.floor(pos))
+    hi = min(lo + 1, n - 1)
+    a.partition((lo, hi), axis=axis)
+    # interpolate in float64 even when ``a`` is float32
+    a_lo = np.asarray(np.take(a, lo, axis=axis), dtype=np.float64)
+    a_hi = np.asarray(np.take(a, hi, axis=axis), dtype=np.float64)
+    return a_lo + (pos - lo) * (a_hi - a_lo)
+
+
+def select_quantiles(a: np.ndarray, qs: np.ndarray) -> np.ndarray:
+    """Interpolated quantiles of 1-D NaN-free ``a`` at every level in ``qs``.
+
+    All the order statistics are selected in one in-place partition of
+    ``a``, so pass a scratch array.
+    """
+    n = a.size
+    pos = np.asarray(qs, dtype=np.float64) * (n - 1)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, n - 1)
+    a.partition(np.unique(np.concatenate((lo, hi))))
+    a_lo = a[lo].astype(np.float64)
+    return a_lo + (pos - lo) * (a[hi] - a_lo)
+
+
+def _nan_quantile_numpy(a: np.ndarray, q: float) -> float:
+    # boolean indexing copies, so the caller's array is not reordered
+    a = a[~np.isnan(a)]
+    if a.size == 0:
+        return np.nan
+    return float(select_quantile(a, q))
+
+
+@_jit(_nan_quantile_numpy, nogil=True)
+def nan_quantile(a: np.ndarray, q: float) -> float:
+    """Linearly interpolated ``q``-quantile of the non-NaN values of ``a``.
+
+    Matches ``np.quantile`` but selects the two order statistics it needs
+    instead of sorting.
+    """
+    buf = np.empty(a.size)
+    n = 0
+    for i in range(a.size):
+        if not math.isnan(a[i]):
+            buf[n] = a[i]
+            n += 1
+    if n == 0:
+        return np.nan
+    buf = buf[:n]
+    pos = q * (n - 1)
+    lo = int(math.floor(pos))
+    part = np.partition(buf, lo)
+    if lo + 1 >= n:
+        return part[lo]
+    # everything right of ``lo`` is >= part[lo]; its min is the next one
+    hi = part[lo + 1 :].min()
+    return part[lo] + (pos - lo) * (hi - part[lo])
+
+
+def _rolling_quantile_numpy(x: np.ndarray, w: int, q: float) -> np.ndarray:
+    # pandas keeps a sorted window, so memory stays O(n) rather than the
+    # n * w copy np.quantile would make of a sliding window view
+    rolling = pd.Series(x).rolling(window=w, min_periods=w)
+    return rolling.quantile(q, interpolation="linear").to_numpy()
+
+
+@_jit(_rolling_quantile_numpy, parallel=True)
+def rolling_quantile(x: np.ndarray, w: int, q: float) -> np.ndarray:
+    """Interpolated ``q``-quantile of every trailing window of ``w`` points.
+
+    Windows are independent, so they are selected in parallel; the first
+    ``w - 1`` points and windows holding a NaN are NaN.
+    """
+    n = x.size
+    out = np.full(n, np.nan)
+    pos = q * (w - 1)
+    lo = int(math.floor(pos))
+    frac = pos - lo
+    for i in prange(w - 1, n):
+        window = x[i - w + 1 : i + 1]
+        if np.isnan(window).any():
+            continue
+        part = np.partition(window, lo)
+        value = part[lo]
+        if lo + 1 < w:
+            value += frac * (part[lo + 1 :].min() - value)
+        out[i] = value
+    return out
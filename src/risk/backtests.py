@@ -1,57 +1,85 @@
+import math
+from typing import Union
+
 import numpy as np
 import pandas as pd
-from scipy.stats import chi2
 
+from risk._kernels import count_transitions, kupiec_lr
+from risk.utils import BacktestArrays, _asarray_f64
 
-def kupiec_pof_test(breaches: pd.Series, alpha: float) -> dict:
-    """Kupiec's POF test comparing the breach rate to ``1 - alpha``.
 
-    Returns ``{'n', 'x', 'p_hat', 'LR', 'p_value'}``.
+ArrayOrSeries = Union[pd.Series, np.ndarray]
+Breaches = Union[ArrayOrSeries, BacktestArrays]
+
+
+def _chi2_df1_sf(LR: float) -> float:
+    """Chi-square survival function for one degree of freedom.
+
+    Both LR statistics are chi2(1), whose tail is ``erfc(sqrt(LR / 2))``.
     """
-    n = len(breaches)
-    x = int(breaches.sum())
-    p = 1 - alpha
-    p_hat = x / n
+    return math.erfc(math.sqrt(max(LR, 0.0) / 2.0))
+
 
-    # avoid log(0)
-    if p_hat in (0, 1):
-        LR = np.nan
-        p_value = np.nan
+def _breach_array(breaches: Breaches) -> np.ndarray:
+    """``breaches`` as one contiguous 0/1 uint8 array, converted exactly once.
+
+    Any nonzero value counts as a breach, so the kernels never see
+    anything but 0 and 1.
+    """
+    if isinstance(breaches, BacktestArrays):
+        if breaches.breaches is None:
+            raise ValueError("Run detect_var_breaches on the arrays first.")
+        arr = breaches.breaches
+    elif isinstance(breaches, pd.Series):
+        arr = breaches.to_numpy()
     else:
-        # log-likelihood ratio
-        num = (1 - p) ** (n - x) * p**x
-        den = (1 - p_hat) ** (n - x) * p_hat**x
-        LR = -2 * np.log(num / den)
-        p_value = 1 - chi2.cdf(LR, df=1)
+        arr = np.asarray(breaches)
+    if arr.dtype != np.bool_:
+        arr = arr != 0
+    # a bool buffer reinterprets as uint8 without a copy
+    return np.ascontiguousarray(arr).view(np.uint8)
+
+
+def _kupiec_pof(b: np.ndarray, alpha: float) -> dict:
+    n, x, LR = kupiec_lr(b, alpha)
+    p_hat = x / n
+
+    # LR is NaN when p_hat is 0 or 1, to avoid log(0)
+    p_value = np.nan if math.isnan(LR) else _chi2_df1_sf(LR)
 
     return {"n": n, "x": x, "p_hat": p_hat, "LR": LR, "p_value": p_value}
 
 
-def christoffersen_independence_test(breaches: pd.Series) -> dict:
-    """Christoffersen independence test for a breach sequence.
+def kupiec_pof_test(breaches: Breaches, alpha: float) -> dict:
+    """Kupiec's POF test comparing the breach rate to ``1 - alpha``.
 
-    Returns the transition counts and test statistics.
+    Returns ``{'n', 'x', 'p_hat', 'LR', 'p_value'}``.
     """
-    # build transitions
-    b = breaches.astype(int).values
-    N00 = np.sum((b[:-1] == 0) & (b[1:] == 0))
-    N01 = np.sum((b[:-1] == 0) & (b[1:] == 1))
-    N10 = np.sum((b[:-1] == 1) & (b[1:] == 0))
-    N11 = np.sum((b[:-1] == 1) & (b[1:] == 1))
+    return _kupiec_pof(_breach_array(breaches), alpha)
+
+
+def _christoffersen_independence(b: np.ndarray) -> dict:
+    # count all four transitions in a single pass
+    N00, N01, N10, N11 = count_transitions(b)
 
     # probs
     pi0 = N01 / (N00 + N01) if (N00 + N01) > 0 else 0
     pi1 = N11 / (N10 + N11) if (N10 + N11) > 0 else 0
-    pi = (N01 + N11) / (N00 + N01 + N10 + N11)
+    total = N00 + N01 + N10 + N11
+    if total == 0:
+        # fewer than two observations have no transitions to test
+        pi = LR = p_value = np.nan
+    else:
+        pi = (N01 + N11) / total
 
-    # log‐likelihoods
-    def ll(n0, n1, p):
-        return n0 * np.log(1 - p) + n1 * np.log(p)
+        # log‐likelihoods
+        def ll(n0, n1, p):
+            return n0 * np.log(1 - p) + n1 * np.log(p)
 
-    ll_ind = ll(N00 + N10, N01 + N11, pi)
-    ll_markov = ll(N00, N01, pi0) + ll(N10, N11, pi1)
-    LR = -2 * (ll_ind - ll_markov)
-    p_value = 1 - chi2.cdf(LR, df=1)
+        ll_ind = ll(N00 + N10, N01 + N11, pi)
+        ll_markov = ll(N00, N01, pi0) + ll(N10, N11, pi1)
+        LR = -2 * (ll_ind - ll_markov)
+        p_value = _chi2_df1_sf(LR)
 
     return {
         "N00": N00,
@@ -66,11 +94,28 @@ def christoffersen_independence_test(breaches: pd.Series) -> dict:
     }
 
 
-def expected_shortfall(returns: pd.Series, alpha: float) -> float:
-    """Expected shortfall at level ``alpha`` for the given returns."""
-    # average loss beyond VaR
-    var_level = np.percentile(returns.dropna(), (1 - alpha) * 100)
-    tail = returns[returns <= var_level]
-    if len(tail) == 0:
+def christoffersen_independence_test(breaches: Breaches) -> dict:
+    """Christoffersen independence test for a breach sequence.
+
+    Returns the transition counts and test statistics.
+    """
+    return _christoffersen_independence(_breach_array(breaches))
+
+
+def _expected_shortfall(r: np.ndarray, alpha: float) -> float:
+    r = r[~np.isnan(r)]
+    # round first so e.g. 0.05 * 100 does not ceil to 6
+    k = math.ceil(round((1 - alpha) * r.size, 9))
+    if k == 0:
         return 0.0
-    return -tail.mean()
+    # average loss beyond VaR, selected in O(n) without sorting
+    tail = np.partition(r, k - 1)[:k]
+    return float(-tail.mean())
+
+
+def expected_shortfall(returns: ArrayOrSeries, alpha: float) -> float:
+    """Expected shortfall at level ``alpha`` for the given returns.
+
+    Averages the worst ``ceil((1 - alpha) * n)`` non-NaN returns.
+    """
+    return _expected_shortfall(_asarray_f64(returns), alpha)
@@ -12,16 +12,35 @@ def fetch_and_save_data(
     output_dir=PROCESSED_DATA_DIR,
 ):
     """
-    Fetches daily Close prices for given tickers and saves each as CSV.
+    Fetches daily Close prices for given tickers in a single batched
+    download and saves each as Parquet.
     """
     os.makedirs(output_dir, exist_ok=True)
 
+    data = yf.download(
+        list(tickers),
+        start=start_date,
+        end=end_date,
+        group_by="ticker",
+        threads=True,
+        progress=False,
+    )
+    today = datetime.today().strftime("%Y-%m-%d")
+
     for ticker, filename_prefix in tickers.items():
-        data = yf.download(ticker, start=start_date, end=end_date)
-        if data.empty:
+        # group_by="ticker" puts the ticker on the outer column level
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker not in data.columns.get_level_values(0):
+                raise ValueError(f"No data fetched for {ticker}")
+            frame = data[ticker]
+        else:
+            frame = data
+        closing = frame[["Close"]].dropna(how="all")
+        if closing.empty:
             raise ValueError(f"No data fetched for {ticker}")
-        closing = data[["Close"]].rename(columns={"Close": f"{filename_prefix}_close"})
-        today = datetime.today().strftime("%Y-%m-%d")
-        path = os.path.join(output_dir, f"{today}_{filename_prefix}.csv")
-        closing.to_csv(path, index_label="Date")
+        closing = closing.rename(columns={"Close": f"{filename_prefix}_close"})
+        path = os.path.join(output_dir, f"{today}_{filename_prefix}.parquet")
+        closing.rename_axis("Date").to_parquet(
+            path, engine="pyarrow", compression="zstd"
+        )
         print(f"[risk.data] saved {ticker} → {path}")
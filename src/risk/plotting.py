@@ -3,37 +3,49 @@ import logging
 # Silence that categorical‐units INFO
 logging.getLogger("matplotlib.category").setLevel(logging.WARNING)
 
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-from typing import cast
+from typing import TYPE_CHECKING, cast
 import pandas as pd
 from typing import List
 
+# pyplot is imported where a figure is created, so importing this module
+# stays cheap
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
+
 
 def plot_var_breaches(
     data: pd.DataFrame,
-    ax: plt.Axes,
+    ax: "Axes",
     title: str,
     breach_col: str = "breach",
     return_col: str = "ret_10d",
     var_col: str = "var_10d",
-) -> Figure:
+    rasterized: bool = False,
+) -> "Figure":
     """
     Plot returns, VaR threshold, and breach points on a single axes.
+
+    ``rasterized`` flattens the lines to a bitmap in vector output, which
+    keeps long series cheap to render.
     """
-    # Convert index to datetime
-    x = pd.to_datetime(data.index)
+    # Convert index to datetime once, only if needed; plain arrays skip
+    # matplotlib's pandas conversion path
+    index = data.index
+    if not isinstance(index, pd.DatetimeIndex):
+        index = pd.to_datetime(index)
+    x = index.to_numpy()
+    returns = data[return_col].to_numpy()
 
     # plot returns
-    ax.plot(x, data[return_col], label="10-day returns")
+    ax.plot(x, returns, label="10-day returns", rasterized=rasterized)
 
     # mark breaches
-    breaches = data[data[breach_col]]
-    bx = pd.to_datetime(breaches.index)
-    ax.scatter(bx, breaches[return_col], marker="x", label="VaR Breaches")
+    mask = data[breach_col].to_numpy(dtype=bool)
+    ax.scatter(x[mask], returns[mask], marker="x", label="VaR Breaches")
 
     # plot VaR
-    ax.plot(x, data[var_col], label="10-day VaR")
+    ax.plot(x, data[var_col].to_numpy(), label="10-day VaR", rasterized=rasterized)
 
     ax.set_title(title)
     ax.set_xlabel("Date")
@@ -42,7 +54,7 @@ def plot_var_breaches(
 
     fig = ax.get_figure()
     assert fig is not None
-    return cast(Figure, fig)
+    return cast("Figure", fig)
 
 
 def plot_multiple_var_breaches(
@@ -52,21 +64,32 @@ def plot_multiple_var_breaches(
     return_col: str = "ret_10d",
     var_col: str = "var_10d",
     figsize: tuple = (20, 5),
-) -> plt.Figure:
+) -> "Figure":
     """
     Stack multiple VaR breach plots vertically for comparison.
+
+    ``figsize`` is the size of each subplot; the figure grows with the
+    number of frames. Subplots share the x-axis.
     """
+    import matplotlib.pyplot as plt
+
     n = len(data_list)
-    fig, axes = plt.subplots(nrows=n, ncols=1, figsize=figsize)
+    # a 2-D axes grid even for one frame, so every frame shares one path
+    fig, axes = plt.subplots(
+        nrows=n,
+        ncols=1,
+        figsize=(figsize[0], figsize[1] * n),
+        sharex=True,
+        squeeze=False,
+        constrained_layout=True,
+    )
 
-    if n == 1:
-        plot_var_breaches(
-            data_list[0], axes, titles[0], breach_col, return_col, var_col
-        )
-    else:
-        for df, title, ax in zip(data_list, titles, axes):
-            plot_var_breaches(df, ax, title, breach_col, return_col, var_col)
+    # let Agg drop vertices that do not change the rendered path
+    with plt.rc_context({"path.simplify_threshold": 1.0}):
+        for df, title, ax in zip(data_list, titles, axes[:, 0]):
+            plot_var_breaches(
+                df, ax, title, breach_col, return_col, var_col, rasterized=True
+            )
 
-    plt.tight_layout()
     plt.show()
     return fig
@@ -1,21 +1,56 @@
+import math
 import os
-from datetime import datetime
-from typing import Union, Dict, List, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Union, Dict, Optional, Tuple
 import logging
 
 import numpy as np
 import pandas as pd
-
-from config import TRADING_DAYS_PER_YEAR, RISK_FREE_RATE
+from pyarrow import csv as pa_csv
+
+from config import (
+    TRADING_DAYS_PER_YEAR,
+    RISK_FREE_RATE,
+    CONFIDENCE_Z,
+    VAR_HORIZON_DAYS,
+    VAR_SCALE,
+    EWMA_ALPHA,
+)
+from risk._kernels import mean_std, rolling_std
 
 logger = logging.getLogger(__name__)
 
 
+def _asarray_f64(values: Union[pd.Series, np.ndarray]) -> np.ndarray:
+    """Contiguous float64 array of ``values``.
+
+    A view, not a copy, for float64 data, so pipeline stages can all
+    call this on the same Series without re-materializing it.
+    """
+    if isinstance(values, pd.Series):
+        values = values.to_numpy(dtype=np.float64)
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+# square-root-of-time factors for the configured horizons, as Python floats
+_SQRT_DAYS = {
+    TRADING_DAYS_PER_YEAR: math.sqrt(TRADING_DAYS_PER_YEAR),
+    VAR_HORIZON_DAYS: math.sqrt(VAR_HORIZON_DAYS),
+}
+
+
+def _sqrt_days(days: int) -> float:
+    """``sqrt(days)``, looked up for the configured horizons."""
+    root = _SQRT_DAYS.get(days)
+    return math.sqrt(days) if root is None else root
+
+
 def annualize_volatility(
     daily_volatility: Union[pd.Series, float], trading_days: int = TRADING_DAYS_PER_YEAR
 ) -> Union[pd.Series, float]:
     """Annualized volatility as ``daily_volatility * sqrt(trading_days)``."""
-    return daily_volatility * np.sqrt(trading_days)
+    return daily_volatility * _sqrt_days(trading_days)
 
 
 def annualize_return(
@@ -31,86 +66,223 @@ def sharpe_ratio(
     trading_days: int = TRADING_DAYS_PER_YEAR,
 ) -> float:
     """Annualized Sharpe ratio of ``returns``."""
-    excess = returns - risk_free_rate / trading_days
-    ann_excess_ret = annualize_return(excess.mean(), trading_days)
-    ann_vol = annualize_volatility(excess.std(), trading_days)
+    # one pass over the returns; subtracting the daily risk-free rate shifts
+    # the mean and leaves the std unchanged, so no excess series is built
+    mean, std = mean_std(_asarray_f64(returns))
+    ann_excess_ret = annualize_return(
+        mean - risk_free_rate / trading_days, trading_days
+    )
+    ann_vol = annualize_volatility(std, trading_days)
     if ann_vol == 0:
         raise ValueError("Volatility is zero, Sharpe ratio undefined.")
     return ann_excess_ret / ann_vol
 
 
 def calculate_daily_returns(price_series: pd.Series) -> pd.Series:
-    """Simple daily returns. Raises ``ValueError`` if series is empty."""
+    """Simple daily returns. Raises ``ValueError`` if series is empty.
+
+    Missing prices are forward-filled first, as ``pct_change`` does, so
+    the move across a gap is kept rather than dropped.
+    """
     if price_series.empty:
         raise ValueError("Price series is empty.")
-    returns = price_series.pct_change().dropna()
-    return returns
+    if price_series.hasnans:
+        price_series = price_series.ffill()
+    # same single-buffer kernel as the log returns, no pct_change copy
+    p = price_series.to_numpy(dtype=np.float64)
+    return _price_ratio_series(
+        p, 1, price_series.index[1:], price_series.name, log=False
+    )
+
+
+def _daily_returns_arr(prices: Union[pd.Series, np.ndarray]) -> np.ndarray:
+    """Simple returns ``(p[t] - p[t - 1]) / p[t - 1]`` as a bare float64 array.
+
+    For callers that go straight to NumPy: one allocation and no NaN
+    scan, so NaN prices propagate instead of being dropped.
+    """
+    a = _asarray_f64(prices)
+    out = np.empty(max(a.size - 1, 0))
+    # difference first: it is exact for nearby prices, so small returns
+    # keep the bits that ``ratio - 1`` would cancel away
+    np.subtract(a[1:], a[:-1], out=out)
+    out /= a[:-1]
+    return out
+
+
+def _price_ratio_series(
+    p: np.ndarray, lag: int, index: pd.Index, name, log: bool = True
+) -> pd.Series:
+    """Return from ``p[t]`` to ``p[t + lag]``, log or simple, NaNs dropped.
+
+    One buffer is allocated and turned into returns in place; the result
+    is labelled with ``index``.
+    """
+    m = max(p.size - lag, 0)
+    later, earlier = p[lag : lag + m], p[:m]
+    if log:
+        out = np.divide(later, earlier)
+        np.log(out, out=out)
+    else:
+        # difference over the base, more accurate than ratio - 1
+        out = np.subtract(later, earlier)
+        out /= earlier
+    s = pd.Series(out, index=index, name=name)
+    return s.dropna() if s.hasnans else s
 
 
 def calculate_log_returns(prices: pd.Series) -> pd.Series:
     """Daily log returns."""
-    return np.log(prices / prices.shift(1)).dropna()
+    # slice the raw prices instead of dividing by a shifted copy
+    p = prices.to_numpy(dtype=np.float64)
+    return _price_ratio_series(p, 1, prices.index[1:], prices.name)
 
 
 def calculate_forward_log_returns(
     prices: pd.Series, days_forward: int = 10
 ) -> pd.Series:
     """Forward log returns over ``days_forward`` days."""
-    fwd = np.log(prices.shift(-days_forward) / prices)
-    return fwd.dropna()
+    p = prices.to_numpy(dtype=np.float64)
+    m = max(p.size - days_forward, 0)
+    return _price_ratio_series(p, days_forward, prices.index[:m], prices.name)
 
 
 def calculate_rolling_volatility(returns: pd.Series, window: int = 21) -> pd.Series:
     """Rolling standard deviation of ``returns``."""
-    return returns.rolling(window=window).std()
+    out = rolling_std(returns.to_numpy(dtype=np.float64), window)
+    return pd.Series(out, index=returns.index, name=returns.name)
+
+
+def ewma_variance(returns: pd.Series, alpha: float = EWMA_ALPHA) -> pd.Series:
+    """EWMA (RiskMetrics) variance of NaN-free ``returns``.
+
+    Runs ``var_t = (1 - alpha) * var_{t-1} + alpha * r_t**2`` seeded with
+    ``r_0**2``, i.e. ``(returns**2).ewm(alpha=alpha, adjust=False).mean()``.
+    """
+    x2 = np.square(returns.to_numpy(dtype=np.float64))
+    if x2.size == 0:
+        return pd.Series(x2, index=returns.index, name=returns.name)
+    # imported here so loading risk.utils does not pull in scipy
+    from scipy.signal import lfilter, lfiltic
+
+    # the recursion as a first-order IIR filter, evaluated in one C loop
+    b, a = [alpha], [1.0, -(1.0 - alpha)]
+    var, _ = lfilter(b, a, x2, zi=lfiltic(b, a, y=[x2[0]]))
+    return pd.Series(var, index=returns.index, name=returns.name)
 
 
 def calculate_parametric_var(
     volatility: pd.Series, confidence_z: float = -2.33, horizon_days: int = 10
 ) -> pd.Series:
     """Parametric VaR: ``confidence_z * sqrt(horizon_days) * volatility``."""
-    return confidence_z * np.sqrt(horizon_days) * volatility
+    if confidence_z == CONFIDENCE_Z and horizon_days == VAR_HORIZON_DAYS:
+        scale = VAR_SCALE
+    else:
+        scale = confidence_z * _sqrt_days(horizon_days)
+    # single scalar-broadcast pass over the volatility series
+    return scale * volatility
 
 
-def load_latest_price_data(
-    directory: str, keyword: str, date_threshold: float = 0.9
-) -> pd.DataFrame:
-    """Return latest CSV containing ``keyword`` as a numeric DataFrame.
+PRICE_FILE_SUFFIXES = (".parquet", ".csv")
+# price files are named ``YYYY-MM-DD_<prefix>.<ext>``
+
 
-    The date column is chosen using ``date_threshold``.
+def _date_prefix_key(name: str) -> Optional[Tuple[int, int, int]]:
+    """``(year, month, day)`` from a ``YYYY-MM-DD_`` file prefix, else None.
+
+    Slices and ``int`` instead of ``strptime``: the format is fixed and
+    only the ordering is needed.
+    """
+    if len(name) < 11 or name[4] != "-" or name[7] != "-" or name[10] != "_":
+        return None
+    y, m, d = name[0:4], name[5:7], name[8:10]
+    if not (y.isdigit() and m.isdigit() and d.isdigit()):
+        return None
+    month, day = int(m), int(d)
+    if not (1 <= month <= 12 and 1 <= day <= 31):
+        return None
+    return int(y), month, day
+
+
+def _copy_on_write() -> bool:
+    """Whether pandas copy-on-write semantics are in effect."""
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    try:
+        return pd.get_option("mode.copy_on_write") is True
+    except KeyError:  # option added in pandas 1.5
+        return False
+
+
+def _find_latest_path(directory: str, keyword: str) -> str:
+    """Path of the most recently dated price file containing ``keyword``.
+
+    Parquet is preferred over a CSV carrying the same date. Scans are
+    cached per directory mtime, which changes whenever a file is added,
+    removed or renamed.
     """
-    # 1) find the latest file
-    files: List[str] = [
-        f for f in os.listdir(directory) if keyword in f and f.endswith(".csv")
-    ]
-    if not files:
-        raise FileNotFoundError(f"No CSVs for '{keyword}' in {directory!r}")
-
-    dated = []
-    for fname in files:
-        try:
-            dt = datetime.strptime(fname.split("_")[0], "%Y-%m-%d")
-            dated.append((fname, dt))
-        except ValueError:
-            continue
-    if not dated:
+    return _scan_latest_path(directory, keyword, os.stat(directory).st_mtime_ns)
+
+
+@lru_cache(maxsize=32)
+def _scan_latest_path(directory: str, keyword: str, mtime_ns: int) -> str:
+    # one pass over the directory, keeping a running max
+    found = False
+    best_key: Optional[Tuple[Tuple[int, int, int], bool]] = None
+    best_path = ""
+    with os.scandir(directory) as it:
+        for entry in it:
+            name = entry.name
+            if not (
+                keyword in name
+                and name.endswith(PRICE_FILE_SUFFIXES)
+                and entry.is_file()
+            ):
+                continue
+            found = True
+            date = _date_prefix_key(name)
+            if date is None:
+                continue
+            key = (date, name.endswith(".parquet"))
+            if best_key is None or key > best_key:
+                best_key, best_path = key, entry.path
+
+    if not found:
+        raise FileNotFoundError(f"No price files for '{keyword}' in {directory!r}")
+    if best_key is None:
         raise FileNotFoundError(
             f"No properly dated files for '{keyword}' in {directory!r}"
         )
+    return best_path
 
-    latest_file = max(dated, key=lambda x: x[1])[0]
-    path = os.path.join(directory, latest_file)
-    logger.info(f"Loading data from {path!r}")
 
-    # 2) read the CSV raw
-    df_raw = pd.read_csv(path)
+# rows parsed to cheaply rule a column out before parsing all of it
+_DATE_PROBE_ROWS = 1000
+
+
+def _read_price_csv(path: str, date_threshold: float) -> pd.DataFrame:
+    """Read a CSV dump, indexing it by its auto-detected date column."""
+    try:
+        # multithreaded, and yields typed numeric and timestamp columns;
+        # read through pyarrow directly to skip pandas' engine wrapper
+        df_raw = pa_csv.read_csv(path).to_pandas()
+    except ValueError:
+        # ArrowInvalid subclasses ValueError; the pyarrow parser is
+        # stricter than the C one about malformed rows
+        df_raw = pd.read_csv(path)
     if df_raw.shape[1] < 2:
         raise ValueError(f"Expected ≥2 columns in {path!r}, got {df_raw.shape[1]}")
 
-    # 3) auto-detect date column
+    # auto-detect date column
     date_col: Optional[str] = None
     for col in df_raw.columns:
-        parsed = pd.to_datetime(df_raw[col], errors="coerce")
+        if pd.api.types.is_datetime64_any_dtype(df_raw[col]):
+            parsed = df_raw[col]
+        else:
+            head = df_raw[col].iloc[:_DATE_PROBE_ROWS]
+            if pd.to_datetime(head, errors="coerce").notna().mean() < date_threshold:
+                continue
+            parsed = pd.to_datetime(df_raw[col], errors="coerce")
         frac = parsed.notna().mean()
         if frac >= date_threshold:
             date_col = col
@@ -126,29 +298,129 @@ def load_latest_price_data(
     # set index
     df = df_raw.set_index(date_col, drop=True)
 
-    # numeric columns
-    df = (
-        df.apply(pd.to_numeric, errors="coerce")
-        .dropna(how="any")
-        .astype("float64", copy=False)
-    )
+    # numeric columns; only non-numeric ones need coercing
+    text_cols = df.select_dtypes(exclude="number").columns
+    if len(text_cols):
+        df[text_cols] = df[text_cols].apply(pd.to_numeric, errors="coerce")
+    return df
+
+
+@lru_cache(maxsize=32)
+def _load_cached(
+    path: str, mtime_ns: int, size: int, date_threshold: float
+) -> pd.DataFrame:
+    """Parse ``path`` into a numeric DataFrame.
+
+    ``mtime_ns`` and ``size`` only key the cache so a rewritten file is
+    parsed again.
+    """
+    if path.endswith(".parquet"):
+        # typed columns and date index as written by fetch_and_save_data
+        df = pd.read_parquet(path)
+    else:
+        df = _read_price_csv(path, date_threshold)
+    df = df.dropna(how="any").astype("float64")
 
     logger.info(f"Loaded {len(df)} rows with columns {list(df.columns)}")
     return df
 
 
-def detect_var_breaches(
-    df: pd.DataFrame, return_col: str, var_col: str, breach_col: str = "breach"
+def load_latest_price_data(
+    directory: str, keyword: str, date_threshold: float = 0.9
 ) -> pd.DataFrame:
-    """Add a boolean column marking VaR breaches."""
-    df[breach_col] = (df[return_col] < df[var_col]) & (df[return_col] < 0)
+    """Return latest price file containing ``keyword`` as a numeric DataFrame.
+
+    Parquet dumps are read as stored; for CSV dumps the date column is
+    chosen using ``date_threshold``. Parsed files are cached until they
+    change on disk; callers may mutate the result without affecting the
+    cache.
+    """
+    path = _find_latest_path(directory, keyword)
+    logger.info(f"Loading data from {path!r}")
+    st = os.stat(path)
+    df = _load_cached(path, st.st_mtime_ns, st.st_size, date_threshold)
+    # under copy-on-write a shallow copy is O(1) and still isolates the cache
+    return df.copy(deep=not _copy_on_write())
+
+
+@dataclass
+class BacktestArrays:
+    """Returns, VaR thresholds and breach flags as contiguous arrays.
+
+    Pass one through :func:`detect_var_breaches`,
+    :func:`summarize_var_breaches` and ``kupiec_pof_test`` to extract
+    the columns only once.
+    """
+
+    returns: np.ndarray
+    var_: np.ndarray
+    breaches: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_frame(
+        cls, df: pd.DataFrame, return_col: str, var_col: str
+    ) -> "BacktestArrays":
+        return cls(
+            _asarray_f64(df[return_col]),
+            _asarray_f64(df[var_col]),
+        )
+
+
+def _breach_mask(r: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Boolean mask of negative returns ``r`` below the VaR threshold ``v``."""
+    mask = np.empty(r.shape, dtype=np.bool_)
+    negative = np.empty(r.shape, dtype=np.bool_)
+    np.less(r, v, out=mask)
+    np.less(r, 0.0, out=negative)
+    return np.logical_and(mask, negative, out=mask)
+
+
+def detect_var_breaches(
+    df: Union[pd.DataFrame, BacktestArrays],
+    return_col: Optional[str] = None,
+    var_col: Optional[str] = None,
+    breach_col: str = "breach",
+) -> Union[pd.DataFrame, BacktestArrays]:
+    """Add a boolean ``breach_col`` marking VaR breaches to ``df``.
+
+    The column is written in place and ``df`` itself is returned; pass
+    a copy to keep the original frame unchanged. A
+    :class:`BacktestArrays` gets its ``breaches`` filled instead, and
+    needs no column names.
+    """
+    if isinstance(df, BacktestArrays):
+        df.breaches = _breach_mask(df.returns, df.var_)
+        return df
+    if return_col is None or var_col is None:
+        raise TypeError("return_col and var_col are required for a DataFrame.")
+    # compare raw arrays; avoids Series alignment and temporaries
+    mask = _breach_mask(_asarray_f64(df[return_col]), _asarray_f64(df[var_col]))
+    # replace the column rather than write into it, so an existing
+    # non-bool breach column cannot keep its dtype
+    df[breach_col] = mask
     return df
 
 
 def summarize_var_breaches(
-    df: pd.DataFrame, breach_col: str = "breach"
+    df: Union[pd.DataFrame, BacktestArrays], breach_col: str = "breach"
 ) -> Dict[str, Union[int, float]]:
     """Return breach count and percentage."""
-    count = int(df[breach_col].sum())
-    pct = float(round(df[breach_col].mean(), 3))
+    if isinstance(df, BacktestArrays):
+        if df.breaches is None:
+            raise ValueError("Run detect_var_breaches on the arrays first.")
+        arr = df.breaches
+    elif df[breach_col].dtype == np.bool_:
+        arr = df[breach_col].to_numpy()
+    else:
+        # nullable or object columns may hold missing values, which the
+        # NA-skipping reductions leave out of both figures
+        col = df[breach_col]
+        return _breach_summary(int(col.sum()), int(col.count()))
+    # one pass over the boolean buffer gives both figures
+    return _breach_summary(int(np.count_nonzero(arr)), arr.size)
+
+
+def _breach_summary(count: int, n: int) -> Dict[str, Union[int, float]]:
+    # an empty frame has no breach rate, as with Series.mean()
+    pct = round(count / n, 3) if n else float("nan")
     return {"count": count, "percentage": pct}
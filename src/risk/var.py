@@ -1,60 +1,297 @@
 import os
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Sequence, Union
 
 import numpy as np
 import pandas as pd
-from scipy.stats import norm
 
-from config import PROCESSED_DATA_DIR, CONFIDENCE_LEVEL, MONTE_CARLO_SIMULATIONS
-from risk.utils import calculate_daily_returns, load_latest_price_data
+import config
+from config import (
+    CONFIDENCE_LEVEL,
+    MONTE_CARLO_SIMULATIONS,
+    MC_SEED,
+    Z_SCORES,
+)
+from risk._kernels import (
+    mean_std,
+    nan_quantile,
+    rolling_quantile,
+    select_quantile,
+    select_quantiles,
+)
+from risk.utils import _asarray_f64, _daily_returns_arr, load_latest_price_data
+
+
+@dataclass(frozen=True)
+class ReturnStream:
+    """Returns as a contiguous float64 array plus their index labels.
+
+    Build one with :meth:`from_series` and pass it to several VaR
+    estimators to convert the Series only once.
+    """
+
+    __slots__ = ("values", "index")
+
+    values: np.ndarray
+    index: np.ndarray
+
+    @classmethod
+    def from_series(cls, returns: pd.Series) -> "ReturnStream":
+        return cls(_asarray_f64(returns), returns.index.to_numpy())
+
+    @classmethod
+    def from_prices(cls, prices: pd.Series) -> "ReturnStream":
+        """Simple daily returns of a clean price series, skipping pandas."""
+        return cls(_daily_returns_arr(prices), prices.index[1:].to_numpy())
+
+
+Returns = Union[ReturnStream, np.ndarray, pd.Series]
+
+
+def _as_array(returns: Returns) -> np.ndarray:
+    """Float64 values of ``returns``, without copying arrays already float64."""
+    if isinstance(returns, pd.Series):
+        return _asarray_f64(returns)
+    # a ReturnStream exposes its array as ``values``; ndarrays pass through
+    return _asarray_f64(getattr(returns, "values", returns))
+
+
+@lru_cache(maxsize=32)
+def _z(confidence_level: float) -> float:
+    """One-tailed z-score ``norm.ppf(1 - confidence_level)``."""
+    z = Z_SCORES.get(confidence_level)
+    if z is None:
+        # scipy is only imported for levels off the table
+        from scipy.stats import norm
+
+        z = float(norm.ppf(1.0 - confidence_level))
+    return z
+
+
+# simulated returns are float32, halving RNG output and partition traffic;
+# the quantile's interpolation is still done in float64
+_MC_DTYPE = np.float32
+
+# draws per independent PCG64 stream when filling the seeded pool; fixed so
+# the values do not depend on how many threads fill it
+_MC_CHUNK = 1 << 16
+
+
+def _seeded_standard_normal(seed: int, out: np.ndarray) -> None:
+    """Fill 1-D ``out`` with standard normals, one jumped stream per chunk.
+
+    Chunk ``i`` draws from ``PCG64(seed).jumped(i)``, so chunks are
+    independent and filled on a thread pool (NumPy releases the GIL).
+    """
+
+    def fill(i: int) -> None:
+        rng = np.random.Generator(np.random.PCG64(seed).jumped(i))
+        chunk = out[i * _MC_CHUNK : (i + 1) * _MC_CHUNK]
+        rng.standard_normal(out=chunk, dtype=out.dtype)
+
+    n_chunks = -(-out.size // _MC_CHUNK)
+    if n_chunks <= 1:
+        fill(0)
+        return
+    with ThreadPoolExecutor(max_workers=min(n_chunks, os.cpu_count() or 1)) as ex:
+        list(ex.map(fill, range(n_chunks)))
+
+
+def _fill_antithetic(
+    rng: Union[np.random.Generator, int], out: np.ndarray
+) -> np.ndarray:
+    """Fill ``out`` along axis 0 with antithetic standard normals ``z, -z``.
+
+    ``rng`` is a Generator, or an int seed for the chunked parallel fill.
+    """
+    n = out.shape[0]
+    half = n // 2
+    if isinstance(rng, np.random.Generator):
+        rng.standard_normal(out=out[: n - half], dtype=out.dtype)
+    else:
+        _seeded_standard_normal(rng, out[: n - half])
+    np.negative(out[:half], out=out[n - half :])
+    return out
+
+
+@lru_cache(maxsize=4)
+def _z_pool(simulations: int, seed: int = MC_SEED) -> np.ndarray:
+    """Read-only pool of ``simulations`` antithetic standard normals.
+
+    Shared by every default-seeded Monte Carlo call, so repeated VaR
+    estimates only rescale the pool instead of redrawing it.
+    """
+    pool = _fill_antithetic(seed, np.empty(simulations, dtype=_MC_DTYPE))
+    pool.flags.writeable = False
+    return pool
 
 
 def historical_var(
-    returns: pd.Series, confidence_level: float = CONFIDENCE_LEVEL
+    returns: Returns, confidence_level: float = CONFIDENCE_LEVEL
 ) -> float:
     """Historical VaR at ``confidence_level``."""
-    if returns.empty:
+    arr = _as_array(returns)
+    if arr.size == 0:
         raise ValueError("Returns series is empty.")
-    var_pct = (1 - confidence_level) * 100
-    var_value = np.percentile(returns.dropna(), var_pct)
+    q = 1 - confidence_level
+    if isinstance(returns, pd.Series) and not returns.hasnans:
+        # pandas caches hasnans, so clean Series skip the NaN compaction;
+        # the copy keeps the caller's values in order
+        var_value = float(select_quantile(arr.copy(), q))
+    else:
+        var_value = nan_quantile(arr, q)
     return abs(var_value)
 
 
+def historical_var_multi(
+    returns: Returns, confidence_levels: Sequence[float]
+) -> np.ndarray:
+    """Historical VaR at several confidence levels from one selection pass.
+
+    Same values as calling :func:`historical_var` per level.
+    """
+    arr = _as_array(returns)
+    if arr.size == 0:
+        raise ValueError("Returns series is empty.")
+    # boolean indexing copies, so partitioning leaves the caller's data alone
+    arr = arr[~np.isnan(arr)]
+    qs = 1 - np.asarray(confidence_levels, dtype=np.float64)
+    if arr.size == 0:
+        return np.full(qs.shape, np.nan)
+    return np.abs(select_quantiles(arr, qs))
+
+
+def rolling_historical_var(
+    returns: Returns, window: int, confidence_level: float = CONFIDENCE_LEVEL
+) -> pd.Series:
+    """Historical VaR over every trailing ``window`` of ``returns``.
+
+    The first ``window - 1`` values, and windows holding a NaN, are NaN.
+    """
+    if window < 1:
+        raise ValueError("window must be a positive integer.")
+    arr = _as_array(returns)
+    out = rolling_quantile(arr, window, 1 - confidence_level)
+    return pd.Series(np.abs(out), index=getattr(returns, "index", None))
+
+
 def parametric_var(
-    returns: pd.Series, confidence_level: float = CONFIDENCE_LEVEL
+    returns: Returns, confidence_level: float = CONFIDENCE_LEVEL
 ) -> float:
     """Parametric VaR under a normal assumption."""
-    if returns.empty:
+    arr = _as_array(returns)
+    if arr.size == 0:
         raise ValueError("Returns series is empty.")
-    mean = returns.mean()
-    std = returns.std()
-    # one-tailed z-score
-    z = norm.ppf(1 - confidence_level)
-    var = -(mean + z * std)
+    mean, std = mean_std(arr)
+    var = -(mean + _z(confidence_level) * std)
     return abs(var)
 
 
 def monte_carlo_var(
-    returns: pd.Series,
+    returns: Returns,
     confidence_level: float = CONFIDENCE_LEVEL,
     simulations: int = MONTE_CARLO_SIMULATIONS,
+    rng: Optional[np.random.Generator] = None,
 ) -> float:
-    """Monte Carlo VaR assuming normal returns."""
-    if returns.empty:
+    """Monte Carlo VaR assuming normal returns.
+
+    Uses antithetic pairs ``z, -z``, halving the RNG work and the
+    estimator's variance; the pairing is exact for an even number of
+    ``simulations``. Without ``rng`` the draws come from a cached pool
+    seeded with ``config.MC_SEED``, so repeated calls are deterministic
+    and skip the RNG entirely. Simulations are held in float32; the
+    quantile is interpolated in float64.
+    """
+    arr = _as_array(returns)
+    if arr.size == 0:
         raise ValueError("Returns series is empty.")
-    mean = returns.mean()
-    std = returns.std()
-    sims = np.random.normal(mean, std, simulations)
-    var = np.percentile(sims, (1 - confidence_level) * 100)
+    mean, std = mean_std(arr)
+    sims = np.empty(simulations, dtype=_MC_DTYPE)
+    if rng is None:
+        np.multiply(_z_pool(simulations), std, out=sims)
+    else:
+        # fill one buffer with the antithetic draws and scale it in place
+        _fill_antithetic(rng, sims)
+        sims *= std
+    sims += mean
+    # select the quantile's order statistics in place instead of sorting
+    var = select_quantile(sims, 1 - confidence_level)
     # cast numpy scalar to float
     return float(abs(var))
 
 
-def main() -> None:
-    """Run a simple VaR demo on the latest processed S&P 500 data."""
-    df = load_latest_price_data(PROCESSED_DATA_DIR, "sp500")
+def _as_matrix(returns: Union[np.ndarray, pd.DataFrame]) -> np.ndarray:
+    """Returns as an ``(N, K)`` float64 array with one asset per column."""
+    if isinstance(returns, pd.DataFrame):
+        returns = returns.to_numpy(dtype=np.float64)
+    arr = np.asarray(returns, dtype=np.float64)
+    if arr.ndim == 1:
+        arr = arr[:, None]
+    if arr.shape[0] == 0:
+        raise ValueError("Returns matrix is empty.")
+    return arr
+
+
+def historical_var_batch(
+    returns: Union[np.ndarray, pd.DataFrame],
+    confidence_level: float = CONFIDENCE_LEVEL,
+) -> np.ndarray:
+    """Historical VaR of every column of an ``(N, K)`` returns matrix."""
+    arr = _as_matrix(returns)
+    quantile = np.nanquantile if np.isnan(arr).any() else np.quantile
+    return np.abs(quantile(arr, 1 - confidence_level, axis=0))
+
+
+def parametric_var_batch(
+    returns: Union[np.ndarray, pd.DataFrame],
+    confidence_level: float = CONFIDENCE_LEVEL,
+) -> np.ndarray:
+    """Parametric VaR of every column of an ``(N, K)`` returns matrix."""
+    arr = _as_matrix(returns)
+    mean = np.nanmean(arr, axis=0)
+    std = np.nanstd(arr, axis=0, ddof=1)
+    return np.abs(-(mean + _z(confidence_level) * std))
+
+
+def monte_carlo_var_batch(
+    returns: Union[np.ndarray, pd.DataFrame],
+    confidence_level: float = CONFIDENCE_LEVEL,
+    simulations: int = MONTE_CARLO_SIMULATIONS,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """Monte Carlo VaR of every column of an ``(N, K)`` returns matrix.
+
+    One ``(simulations, K)`` block of antithetic standard normals is drawn
+    and scaled column-wise, as in :func:`monte_carlo_var`; without ``rng``
+    every column rescales the same cached pool.
+    """
+    arr = _as_matrix(returns)
+    mean = np.nanmean(arr, axis=0)
+    std = np.nanstd(arr, axis=0, ddof=1)
+    sims = np.empty((simulations, arr.shape[1]), dtype=_MC_DTYPE)
+    if rng is None:
+        np.multiply(_z_pool(simulations)[:, None], std, out=sims)
+    else:
+        _fill_antithetic(rng, sims)
+        sims *= std
+    sims += mean
+    return np.abs(select_quantile(sims, 1 - confidence_level, axis=0))
+
+
+def main(processed_data_dir: Optional[str] = None) -> None:
+    """Run a simple VaR demo on the latest processed S&P 500 data.
+
+    ``processed_data_dir`` defaults to ``config.PROCESSED_DATA_DIR``, read
+    when called so patching the config needs no module reload.
+    """
+    if processed_data_dir is None:
+        processed_data_dir = config.PROCESSED_DATA_DIR
+    df = load_latest_price_data(processed_data_dir, "sp500")
     prices = df.iloc[:, 0]
-    rets = calculate_daily_returns(prices)
+    # convert once and share the array across the three estimators
+    rets = ReturnStream.from_prices(prices)
     print("Loaded latest S&P 500 prices (rows={})".format(len(df)))
     print("Historical VaR:", historical_var(rets))
     print("Parametric VaR:", parametric_var(rets))
@@ -1,6 +1,7 @@
 import numpy as np
 import pandas as pd
 import pytest
+from scipy.stats import chi2
 
 from risk.backtests import (
     kupiec_pof_test,
@@ -19,6 +20,16 @@ def test_kupiec_pof_counts_and_pvalue():
     assert res["LR"] == pytest.approx(0.0, abs=1e-12)
 
 
+def test_kupiec_pof_large_sample_is_finite():
+    # (1 - p) ** (n - x) underflows to zero for samples this long
+    breaches = pd.Series([False] * 4700 + [True] * 300)
+    res = kupiec_pof_test(breaches, alpha=0.95)
+    p, p_hat = 0.05, 0.06
+    expected = -2 * (4700 * np.log((1 - p) / (1 - p_hat)) + 300 * np.log(p / p_hat))
+    assert res["LR"] == pytest.approx(expected)
+    assert res["p_value"] == pytest.approx(chi2.sf(expected, df=1))
+
+
 def test_christoffersen_transition_counts_and_finite_stats():
     breaches = pd.Series([False, False, True, False, True, True])
     res = christoffersen_independence_test(breaches)
@@ -34,3 +45,37 @@ def test_expected_shortfall_manual_example():
     returns = pd.Series([-0.02, 0.01, -0.05, -0.10])
     es = expected_shortfall(returns, alpha=0.95)
     assert es == pytest.approx(0.10)
+
+
+def test_expected_shortfall_ignores_nans_and_empty():
+    returns = pd.Series([0.01, np.nan] + [-0.01 * i for i in range(1, 20)])
+    # 20 valid returns at 90% -> mean of the two worst
+    assert expected_shortfall(returns, alpha=0.90) == pytest.approx(0.185)
+    assert expected_shortfall(pd.Series(dtype=float), alpha=0.95) == 0.0
+
+
+def test_backtests_accept_numpy_arrays():
+    breaches = pd.Series([False, False, True, False, True, True])
+    arr = breaches.to_numpy()
+    assert kupiec_pof_test(arr, alpha=0.95) == kupiec_pof_test(breaches, alpha=0.95)
+    assert christoffersen_independence_test(arr)["N01"] == 2
+
+    returns = np.array([-0.02, 0.01, -0.05, -0.10])
+    assert expected_shortfall(returns, alpha=0.95) == pytest.approx(0.10)
+
+
+def test_christoffersen_without_transitions_is_nan():
+    for breaches in (pd.Series([True]), pd.Series([], dtype=bool)):
+        res = christoffersen_independence_test(breaches)
+        assert (res["N00"], res["N01"], res["N10"], res["N11"]) == (0, 0, 0, 0)
+        assert np.isnan(res["pi"]) and np.isnan(res["LR"])
+        assert np.isnan(res["p_value"])
+
+
+def test_breach_values_other_than_zero_one_count_as_breaches():
+    ints = pd.Series([0, 2, 0, 0, 1, 1, 0, 1, 0, 0])
+    flags = ints != 0
+    assert christoffersen_independence_test(ints) == pytest.approx(
+        christoffersen_independence_test(flags)
+    )
+    assert kupiec_pof_test(ints, 0.95)["x"] == 4
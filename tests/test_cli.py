@@ -1,5 +1,4 @@
 import pandas as pd
-from importlib import reload
 
 import risk.var as var
 import config
@@ -16,12 +15,13 @@ def test_risk_example_runs(tmp_path, capsys, monkeypatch):
     path = tmp_path / "2024-01-01_sp500.csv"
     df.to_csv(path, index=False)
 
-    monkeypatch.setattr(config, "PROCESSED_DATA_DIR", str(tmp_path))
-    monkeypatch.setattr(var, "PROCESSED_DATA_DIR", str(tmp_path))
-
-    reload(var)  # ensure function picks up new constant
-    var.main()
+    var.main(str(tmp_path))
     out = capsys.readouterr().out
     assert "Historical VaR:" in out
     assert "Parametric VaR:" in out
     assert "Monte Carlo VaR:" in out
+
+    # the default directory is read from config at call time
+    monkeypatch.setattr(config, "PROCESSED_DATA_DIR", str(tmp_path))
+    var.main()
+    assert "Monte Carlo VaR:" in capsys.readouterr().out
@@ -1,5 +1,4 @@
 import pandas as pd
-from importlib import reload
 
 import config
 import risk.data as rdata
@@ -20,12 +19,11 @@ def test_full_pipeline(tmp_path, capsys, monkeypatch):
         index=pd.date_range("2024-01-01", periods=5),
     )
 
-    def fake_download(ticker, start=None, end=None):
-        return df
+    def fake_download(tickers, start=None, end=None, **kwargs):
+        # batched downloads come back with the ticker as outer column level
+        return pd.concat({t: df for t in tickers}, axis=1)
 
     monkeypatch.setattr(rdata.yf, "download", fake_download)
-    monkeypatch.setattr(config, "PROCESSED_DATA_DIR", str(tmp_path))
-    monkeypatch.setattr(var, "PROCESSED_DATA_DIR", str(tmp_path))
 
     # fetch sample data
     rdata.fetch_and_save_data(
@@ -35,8 +33,7 @@ def test_full_pipeline(tmp_path, capsys, monkeypatch):
         output_dir=str(tmp_path),
     )
 
-    reload(var)  # pick up patched constant
-    var.main()
+    var.main(str(tmp_path))
     out = capsys.readouterr().out
     assert "Historical VaR:" in out
     assert "Parametric VaR:" in out
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from risk._kernels import (
+    _count_transitions_numpy,
+    _kupiec_lr_numpy,
+    _mean_std_numpy,
+    _nan_quantile_numpy,
+    _rolling_quantile_numpy,
+    _rolling_std_pandas,
+    count_transitions,
+    kupiec_lr,
+    mean_std,
+    nan_quantile,
+    rolling_quantile,
+    rolling_std,
+    select_quantile,
+)
+
+
+def test_count_transitions_matches_numpy_fallback():
+    rng = np.random.default_rng(0)
+    b = (rng.random(500) < 0.1).astype(np.uint8)
+    counts = count_transitions(b)
+    assert counts == _count_transitions_numpy(b)
+    assert sum(counts) == b.size - 1
+    # values other than 0/1 are breaches, never out-of-range indices
+    b[::7] = 2
+    assert count_transitions(b) == _count_transitions_numpy(b)
+
+
+def test_kupiec_lr_matches_numpy_fallback():
+    rng = np.random.default_rng(4)
+    b = (rng.random(1000) < 0.05).astype(np.uint8)
+    n, x, lr = kupiec_lr(b, 0.95)
+    assert (n, x) == _kupiec_lr_numpy(b, 0.95)[:2]
+    assert np.isclose(lr, _kupiec_lr_numpy(b, 0.95)[2])
+    assert np.isnan(kupiec_lr(np.zeros(10, np.uint8), 0.95)[2])
+
+
+def test_rolling_std_matches_pandas_with_nans():
+    rng = np.random.default_rng(1)
+    x = rng.normal(0.0, 0.01, 300)
+    x[[10, 11, 150]] = np.nan
+    assert np.allclose(rolling_std(x, 21), _rolling_std_pandas(x, 21), equal_nan=True)
+
+
+def test_mean_std_matches_numpy_fallback():
+    rng = np.random.default_rng(2)
+    x = rng.normal(0.001, 0.02, 1000)
+    x[5] = np.nan
+    assert np.allclose(mean_std(x), _mean_std_numpy(x))
+    assert np.isnan(mean_std(np.array([1.0]))[1])
+
+
+def test_mean_std_is_stable_for_large_offsets():
+    # E[x^2] - E[x]^2 loses every significant digit here; Welford does not
+    rng = np.random.default_rng(5)
+    x = 1e6 + rng.normal(0.0, 1e-3, 10_000)
+    mean, std = mean_std(x)
+    assert mean == pytest.approx(x.mean())
+    assert std == pytest.approx(x.std(ddof=1), rel=1e-6)
+
+
+def test_nan_quantile_matches_numpy():
+    rng = np.random.default_rng(3)
+    x = rng.normal(0.0, 0.02, 251)
+    x[[0, 100]] = np.nan
+    for q in (0.0, 0.01, 0.05, 0.5, 1.0):
+        expected = np.nanquantile(x, q)
+        assert np.isclose(nan_quantile(x, q), expected)
+        assert np.isclose(_nan_quantile_numpy(x, q), expected)
+    assert np.isnan(nan_quantile(np.array([np.nan]), 0.05))
+
+
+def test_rolling_std_long_series_does_not_drift():
+    # the online update must stay accurate after many add/remove steps
+    rng = np.random.default_rng(4)
+    x = 100.0 + rng.normal(0.0, 0.01, 100_000)
+    for w in (21, 250):
+        assert np.allclose(
+            rolling_std(x, w), _rolling_std_pandas(x, w), rtol=1e-6, equal_nan=True
+        )
+
+
+def test_select_quantile_matches_numpy_along_axis():
+    rng = np.random.default_rng(6)
+    x = rng.normal(0.0, 1.0, (1001, 4))
+    for q in (0.0, 0.05, 0.5, 1.0):
+        expected = np.quantile(x, q, axis=0)
+        assert np.allclose(select_quantile(x.copy(), q, axis=0), expected)
+        assert np.isclose(select_quantile(x[:, 0].copy(), q), expected[0])
+
+
+def test_rolling_quantile_matches_numpy_fallback():
+    rng = np.random.default_rng(6)
+    x = rng.normal(0.0, 0.02, 400)
+    x[200] = np.nan
+    for w, q in ((1, 0.05), (20, 0.05), (250, 0.01)):
+        out = rolling_quantile(x, w, q)
+        assert np.allclose(out, _rolling_quantile_numpy(x, w, q), equal_nan=True)
+    assert np.isnan(rolling_quantile(x[:5], 10, 0.05)).all()
+    fallback = _rolling_quantile_numpy(x, 20, 0.05)
+    assert np.isclose(fallback[19], np.quantile(x[:20], 0.05))
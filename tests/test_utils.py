@@ -2,7 +2,12 @@ import pytest
 import pandas as pd
 import numpy as np
 
+from config import CONFIDENCE_Z, VAR_HORIZON_DAYS
+from risk.backtests import kupiec_pof_test
 from risk.utils import (
+    BacktestArrays,
+    _asarray_f64,
+    _daily_returns_arr,
     annualize_return,
     annualize_volatility,
     calculate_daily_returns,
@@ -10,6 +15,7 @@ from risk.utils import (
     calculate_forward_log_returns,
     calculate_rolling_volatility,
     calculate_parametric_var,
+    ewma_variance,
     load_latest_price_data,
     sharpe_ratio,
     detect_var_breaches,
@@ -30,6 +36,14 @@ def test_calculate_daily_returns():
     # expect two 10% returns
     ret = calculate_daily_returns(prices)
     assert np.allclose(ret.values, [0.1, 0.1])
+    assert np.allclose(_daily_returns_arr(prices), ret.values)
+    assert ret.index.equals(prices.index[1:])
+    # float64 Series convert to a view that later stages can share
+    assert np.shares_memory(_asarray_f64(ret), ret.to_numpy())
+
+    # a missing price is padded, so the move across the gap survives
+    gappy = pd.Series([1.0, np.nan, 1.1], index=prices.index)
+    assert np.allclose(calculate_daily_returns(gappy).values, [0.0, 0.1])
 
     # empty series -> ValueError
     with pytest.raises(ValueError):
@@ -61,6 +75,22 @@ def test_rolling_vol_and_parametric_var():
     var = calculate_parametric_var(vol_series, confidence_z=-1.0, horizon_days=1)
     assert np.allclose(var.values, [-1.0, -2.0, -3.0])
 
+    # config defaults use the precomputed scale
+    var = calculate_parametric_var(
+        vol_series, confidence_z=CONFIDENCE_Z, horizon_days=VAR_HORIZON_DAYS
+    )
+    assert np.allclose(
+        var.values, CONFIDENCE_Z * np.sqrt(VAR_HORIZON_DAYS) * vol_series
+    )
+
+
+def test_ewma_variance_matches_pandas_ewm():
+    rets = pd.Series([0.01, -0.02, 0.015, -0.03, 0.005])
+    expected = (rets**2).ewm(alpha=0.28, adjust=False).mean()
+    result = ewma_variance(rets, alpha=0.28)
+    assert np.allclose(result.values, expected.values)
+    assert result.index.equals(rets.index)
+
 
 def test_sharpe_ratio_and_edge():
     # zero returns -> error
@@ -75,6 +105,11 @@ def test_sharpe_ratio_and_edge():
     assert isinstance(sr, float)
     assert not np.isnan(sr)
 
+    # same as annualizing the explicit excess-return series
+    excess = rets - 0.03 / 252
+    expected = excess.mean() * 252 / (excess.std() * np.sqrt(252))
+    assert sharpe_ratio(rets, risk_free_rate=0.03) == pytest.approx(expected)
+
 
 def test_detect_and_summarize_breaches():
     # small DataFrame
@@ -90,10 +125,46 @@ def test_detect_and_summarize_breaches():
     # only middle row breaches
     assert df2["breach"].tolist() == [False, True, False]
 
+    # the column is written into the caller's frame
+    assert "breach" not in df.columns
+    out = detect_var_breaches(df, return_col="ret", var_col="var")
+    assert out is df
+    assert df["breach"].tolist() == [False, True, False]
+
+    # re-running over a stale int column replaces it with a bool one
+    df["breach"] = [0, 0, 0]
+    detect_var_breaches(df, return_col="ret", var_col="var")
+    assert df["breach"].dtype == bool
+    assert df["breach"].tolist() == [False, True, False]
+
     summary = summarize_var_breaches(df2, breach_col="breach")
     assert summary["count"] == 1
     assert summary["percentage"] == pytest.approx(1 / 3, rel=1e-3)
 
+    empty = summarize_var_breaches(df2.iloc[:0], breach_col="breach")
+    assert empty["count"] == 0
+    assert np.isnan(empty["percentage"])
+
+
+def test_summarize_breaches_skips_missing_values():
+    nullable = pd.DataFrame({"breach": pd.array([True, pd.NA, False], "boolean")})
+    obj = pd.DataFrame({"breach": pd.Series([True, np.nan, False], dtype=object)})
+    for df in (nullable, obj):
+        assert summarize_var_breaches(df) == {"count": 1, "percentage": 0.5}
+
+
+def test_backtest_arrays_match_dataframe_pipeline():
+    df = pd.DataFrame({"ret": [0.05, -0.10, -0.02, -0.07], "var": [-0.05] * 4})
+    arrays = detect_var_breaches(BacktestArrays.from_frame(df, "ret", "var"))
+    detect_var_breaches(df, return_col="ret", var_col="var")
+
+    assert arrays.breaches.tolist() == df["breach"].tolist()
+    assert summarize_var_breaches(arrays) == summarize_var_breaches(df)
+    assert kupiec_pof_test(arrays, 0.95) == kupiec_pof_test(df["breach"], 0.95)
+
+    with pytest.raises(ValueError):
+        summarize_var_breaches(BacktestArrays.from_frame(df, "ret", "var"))
+
 
 def _write_csv(path, df):
     """Helper to write DataFrame to CSV without index."""
@@ -134,3 +205,73 @@ def test_load_latest_price_data_no_match(tmp_path):
 
     with pytest.raises(FileNotFoundError):
         load_latest_price_data(str(tmp_path), "missing")
+
+
+def test_load_latest_price_data_cache_returns_copies(tmp_path):
+    df = pd.DataFrame(
+        {"Date": pd.date_range("2024-01-01", periods=3), "px": [1.0, 2.0, 3.0]}
+    )
+    path = tmp_path / "2024-01-01_keyword.csv"
+    _write_csv(path, df)
+
+    first = load_latest_price_data(str(tmp_path), "keyword")
+    first["px"] = 0.0
+    again = load_latest_price_data(str(tmp_path), "keyword")
+    again.iloc[0, 0] = -1.0
+    second = load_latest_price_data(str(tmp_path), "keyword")
+    assert second["px"].tolist() == [1.0, 2.0, 3.0]
+
+    # rewriting the file invalidates the cached parse
+    _write_csv(path, df.assign(px=[40.0, 50.0, 60.0]))
+    assert load_latest_price_data(str(tmp_path), "keyword")["px"].iloc[0] == 40.0
+
+
+def test_load_latest_price_data_prefers_parquet(tmp_path):
+    idx = pd.date_range("2024-01-01", periods=3, name="Date")
+    pd.DataFrame({"sp500_close": [1.0, 2.0, 3.0]}, index=idx).to_parquet(
+        tmp_path / "2024-01-01_sp500.parquet"
+    )
+    _write_csv(
+        tmp_path / "2024-01-01_sp500.csv",
+        pd.DataFrame({"Date": idx, "sp500_close": [7.0, 8.0, 9.0]}),
+    )
+
+    loaded = load_latest_price_data(str(tmp_path), "sp500")
+    assert loaded["sp500_close"].tolist() == [1.0, 2.0, 3.0]
+    assert isinstance(loaded.index, pd.DatetimeIndex)
+
+
+def test_load_latest_price_data_sees_new_files(tmp_path):
+    df = pd.DataFrame({"Date": pd.date_range("2024-01-01", periods=2), "x": [1, 2]})
+    _write_csv(tmp_path / "2024-01-01_keyword.csv", df)
+    assert load_latest_price_data(str(tmp_path), "keyword")["x"].tolist() == [1, 2]
+
+    # a new file changes the directory mtime, invalidating the cached scan
+    _write_csv(tmp_path / "2024-02-01_keyword.csv", df.assign(x=[3, 4]))
+    assert load_latest_price_data(str(tmp_path), "keyword")["x"].tolist() == [3, 4]
+
+
+def test_load_latest_price_data_skips_undated_files(tmp_path):
+    df = pd.DataFrame({"Date": pd.date_range("2024-01-01", periods=2), "x": [1, 2]})
+    _write_csv(tmp_path / "backup_keyword.csv", df.assign(x=[9, 9]))
+    _write_csv(tmp_path / "2024-13-01_keyword.csv", df.assign(x=[9, 9]))
+    with pytest.raises(FileNotFoundError):
+        load_latest_price_data(str(tmp_path), "keyword")
+
+    _write_csv(tmp_path / "2024-01-01_keyword.csv", df)
+    loaded = load_latest_price_data(str(tmp_path), "keyword")
+    assert loaded["x"].tolist() == [1.0, 2.0]
+
+
+def test_load_latest_price_data_detects_later_date_column(tmp_path):
+    df = pd.DataFrame(
+        {
+            "price": ["1.5", "n/a", "3.5"],
+            "Date": pd.date_range("2024-01-01", periods=3).strftime("%Y-%m-%d"),
+        }
+    )
+    _write_csv(tmp_path / "2024-01-01_keyword.csv", df)
+
+    loaded = load_latest_price_data(str(tmp_path), "keyword")
+    assert loaded.index.name == "Date"
+    assert loaded["price"].tolist() == [1.5, 3.5]
@@ -1,8 +1,23 @@
 import pytest
 import numpy as np
 import pandas as pd
+from scipy.stats import norm
 
-from risk.var import historical_var, parametric_var, monte_carlo_var
+from config import CONFIDENCE_LEVEL, CONFIDENCE_Z, Z_SCORES
+from risk.var import (
+    _MC_CHUNK,
+    _z,
+    _z_pool,
+    ReturnStream,
+    historical_var,
+    parametric_var,
+    monte_carlo_var,
+    historical_var_batch,
+    historical_var_multi,
+    parametric_var_batch,
+    monte_carlo_var_batch,
+    rolling_historical_var,
+)
 
 
 def test_historical_var_simple():
@@ -21,6 +36,83 @@ def test_parametric_and_monte_carlo_on_constant():
     assert mc == pytest.approx(0.0)
 
 
+def test_monte_carlo_var_reproducible_with_rng():
+    rets = pd.Series([-0.02, 0.01, 0.005, -0.01, 0.015])
+    a = monte_carlo_var(rets, rng=np.random.default_rng(0), simulations=2000)
+    b = monte_carlo_var(rets, rng=np.random.default_rng(0), simulations=2000)
+    assert a == b
+    # odd simulation counts get one unpaired draw
+    assert np.isfinite(monte_carlo_var(rets, simulations=1001))
+    # the default pool is shared, so repeated calls agree exactly
+    assert monte_carlo_var(rets) == monte_carlo_var(rets)
+
+
+def test_seeded_pool_is_chunked_reproducibly():
+    n = 2 * _MC_CHUNK + 10
+    pool = _z_pool(n, seed=1)
+    assert not pool.flags.writeable
+    # antithetic halves, and the first chunk is stream 0 of the seed
+    assert np.array_equal(pool[n // 2 :], -pool[: n // 2])
+    rng = np.random.Generator(np.random.PCG64(1))
+    first = rng.standard_normal(_MC_CHUNK, dtype=np.float32)
+    assert np.array_equal(pool[:_MC_CHUNK], first)
+    assert abs(pool[: n // 2].std() - 1.0) < 0.01
+
+
+def test_var_accepts_arrays_and_return_streams():
+    rets = pd.Series([-0.02, 0.01, 0.005, -0.01, 0.015])
+    stream = ReturnStream.from_series(rets)
+    for fn in (historical_var, parametric_var):
+        assert fn(stream) == pytest.approx(fn(rets))
+        assert fn(rets.to_numpy()) == pytest.approx(fn(rets))
+    assert monte_carlo_var(stream, rng=np.random.default_rng(0)) == pytest.approx(
+        monte_carlo_var(rets, rng=np.random.default_rng(0))
+    )
+
+
+def test_batch_var_matches_per_column():
+    rng = np.random.default_rng(7)
+    rets = pd.DataFrame(rng.normal(0.0, 0.01, (250, 3)), columns=list("abc"))
+    for batch, single in (
+        (historical_var_batch, historical_var),
+        (parametric_var_batch, parametric_var),
+    ):
+        expected = [single(rets[c], confidence_level=0.99) for c in rets]
+        assert np.allclose(batch(rets, confidence_level=0.99), expected)
+
+    mc = monte_carlo_var_batch(rets, rng=np.random.default_rng(0))
+    assert mc.shape == (3,)
+    assert np.allclose(mc, parametric_var_batch(rets), rtol=0.1)
+
+
+def test_historical_var_multi_matches_single_levels():
+    rng = np.random.default_rng(9)
+    rets = pd.Series(rng.normal(0.0, 0.01, 501))
+    rets.iloc[10] = np.nan
+    levels = [0.9, 0.95, 0.99, 0.999]
+    expected = [historical_var(rets, confidence_level=cl) for cl in levels]
+    assert np.allclose(historical_var_multi(rets, levels), expected)
+
+
+def test_rolling_historical_var_matches_per_window():
+    rng = np.random.default_rng(8)
+    rets = pd.Series(rng.normal(0.0, 0.01, 120))
+    rolled = rolling_historical_var(rets, 60, confidence_level=0.95)
+    assert rolled.index.equals(rets.index)
+    assert rolled.iloc[:59].isna().all()
+    for end in (60, 90, 120):
+        expected = historical_var(rets.iloc[end - 60 : end], confidence_level=0.95)
+        assert rolled.iloc[end - 1] == pytest.approx(expected)
+
+
+def test_z_table_matches_norm_ppf():
+    for cl, z in Z_SCORES.items():
+        assert z == float(norm.ppf(1 - cl))
+    # config's default z-score and parametric_var's come from one table
+    assert CONFIDENCE_Z == _z(CONFIDENCE_LEVEL)
+    assert _z(0.8) == pytest.approx(norm.ppf(0.2))
+
+
 def test_empty_series_raises():
     empty = pd.Series(dtype=float)
     with pytest.raises(ValueError):
@@ -29,3 +121,5 @@ def test_empty_series_raises():
         parametric_var(empty)
     with pytest.raises(ValueError):
         monte_carlo_var(empty)
+    with pytest.raises(ValueError):
+        historical_var(np.array([]))